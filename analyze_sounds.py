@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+"""
+Analyze, trim and normalize WAV sound effects.
+
+Sample data is memory-mapped straight from the file's data chunk with
+np.memmap (no per-sample unpacking) and processed in fixed-size blocks, so
+large sprite banks are never loaded or converted as a whole. For each file
+this reports peak, RMS, active RMS and ITU-R BS.1770 integrated loudness,
+trims leading/trailing silence and optionally normalizes the peak level or
+the loudness; changed files are rewritten in a single streaming pass.
+
+Usage:
+    python analyze_sounds.py [--normalize DBFS | --loudness LUFS] [--dry-run] [files...]
+"""
+import argparse
+import glob
+import os
+import struct
+
+import numpy as np
+
+SOUNDS_DIR = "smart-divination/apps/tarot/assets/sounds"
+
+WAVE_FORMAT_PCM = 1
+WAVE_FORMAT_IEEE_FLOAT = 3
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# Frames per processing block
+BLOCK_FRAMES = 1 << 18
+
+# BS.1770 gating: 400 ms blocks with 75% overlap, absolute and relative gates
+LOUDNESS_BLOCK_S = 0.4
+LOUDNESS_STEP_S = 0.1
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+# Input carried over between blocks so the K-weighting filter sees a
+# continuous signal (its impulse response has decayed well before this)
+K_WEIGHTING_HISTORY_S = 0.5
+
+# Loudness normalization never raises the sample peak above this level
+LOUDNESS_PEAK_CEILING_DB = -1.0
+
+
+class WavInfo:
+    """Layout of a WAV file's fmt and data chunks"""
+
+    def __init__(self, path, fmt_chunk, data_offset, data_size):
+        self.path = path
+        self.fmt_chunk = fmt_chunk
+        self.data_offset = data_offset
+
+        if len(fmt_chunk) < 16:
+            raise ValueError(f"fmt chunk too short ({len(fmt_chunk)} bytes) in {path}")
+        format_tag, self.channels, self.sample_rate = struct.unpack('<HHI', fmt_chunk[:8])
+        self.bits = struct.unpack('<H', fmt_chunk[14:16])[0]
+        if self.channels == 0 or self.sample_rate == 0:
+            raise ValueError(f"Invalid channel count or sample rate in {path}")
+        if format_tag == WAVE_FORMAT_EXTENSIBLE:
+            if len(fmt_chunk) < 26:
+                raise ValueError(f"Extensible fmt chunk too short in {path}")
+            # Sub-format GUID starts with the actual format tag
+            format_tag = struct.unpack('<H', fmt_chunk[24:26])[0]
+        self.format_tag = format_tag
+
+        if format_tag == WAVE_FORMAT_PCM and self.bits in (8, 16, 32):
+            self.dtype = np.dtype({8: 'u1', 16: '<i2', 32: '<i4'}[self.bits])
+        elif format_tag == WAVE_FORMAT_IEEE_FLOAT and self.bits == 32:
+            self.dtype = np.dtype('<f4')
+        else:
+            raise ValueError(f"Unsupported WAV format {format_tag} ({self.bits}-bit)")
+
+        self.frames = data_size // (self.dtype.itemsize * self.channels)
+
+    @property
+    def full_scale(self):
+        """Amplitude of a 0 dBFS sample"""
+        if self.dtype.kind == 'f':
+            return 1.0
+        return float(2 ** (self.bits - 1))
+
+    def memmap(self):
+        """Read-only (frames, channels) view of the sample data"""
+        return np.memmap(
+            self.path,
+            dtype=self.dtype,
+            mode='r',
+            offset=self.data_offset,
+            shape=(self.frames, self.channels),
+        )
+
+
+def read_wav_info(path):
+    """Walk the RIFF chunks and locate fmt and data"""
+    with open(path, 'rb') as f:
+        header = f.read(12)
+        if len(header) < 12:
+            raise ValueError(f"Not a WAV file: {path}")
+        riff, _, wave_id = struct.unpack('<4sI4s', header)
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"Not a WAV file: {path}")
+
+        fmt_chunk = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"No data chunk in {path}")
+            chunk_id, chunk_size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt_chunk = f.read(chunk_size)
+                f.seek(chunk_size % 2, os.SEEK_CUR)
+            elif chunk_id == b'data':
+                if fmt_chunk is None:
+                    raise ValueError(f"data chunk before fmt chunk in {path}")
+                data_size = min(chunk_size, os.path.getsize(path) - f.tell())
+                return WavInfo(path, fmt_chunk, f.tell(), data_size)
+            else:
+                # Chunks are word aligned
+                f.seek(chunk_size + chunk_size % 2, os.SEEK_CUR)
+
+
+def blocks(samples, start=0, stop=None, size=BLOCK_FRAMES):
+    """Yield centred float32 blocks of samples[start:stop]"""
+    stop = len(samples) if stop is None else stop
+    for offset in range(start, stop, size):
+        block = samples[offset:min(offset + size, stop)].astype(np.float32)
+        if samples.dtype == np.uint8:
+            block -= 128.0
+        yield offset, block
+
+
+def k_weighting(sample_rate):
+    """BS.1770 K-weighting biquads (b, a) for a sample rate
+
+    High shelf (head response) followed by the RLB high-pass, derived from
+    the analog prototype so that any sample rate gets the same curve.
+    """
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = (
+        [(vh + vb * k / q + k * k) / a0, 2 * (k * k - vh) / a0, (vh - vb * k / q + k * k) / a0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0],
+    )
+
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    high_pass = (
+        [1.0, -2.0, 1.0],
+        [1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0],
+    )
+    return [shelf, high_pass]
+
+
+class KWeighting:
+    """Streaming K-weighting filter over consecutive sample blocks
+
+    Each block is filtered in the frequency domain with the exact response
+    of the biquad cascade (overlap-save), so every sample is processed by
+    vectorized FFTs instead of a per-sample recursion.
+    """
+
+    def __init__(self, sample_rate, channels):
+        self.biquads = k_weighting(sample_rate)
+        self.history = np.zeros((int(sample_rate * K_WEIGHTING_HISTORY_S), channels))
+        self.responses = {}
+
+    def response(self, n_fft):
+        """Complex response of the cascade on the rfft frequency grid"""
+        if n_fft not in self.responses:
+            z = np.exp(-2j * np.pi * np.fft.rfftfreq(n_fft))
+            response = np.ones_like(z)
+            for b, a in self.biquads:
+                response *= (b[0] + b[1] * z + b[2] * z * z) / (a[0] + a[1] * z + a[2] * z * z)
+            self.responses[n_fft] = response
+        return self.responses[n_fft]
+
+    def __call__(self, block):
+        """K-weighted copy of block, continuing from the previous block"""
+        frames = np.concatenate([self.history, block])
+        n_fft = 1 << (len(frames) - 1).bit_length()
+        spectrum = np.fft.rfft(frames, n_fft, axis=0) * self.response(n_fft)[:, None]
+        self.history = frames[len(frames) - len(self.history):]
+        return np.fft.irfft(spectrum, n_fft, axis=0)[len(frames) - len(block):len(frames)]
+
+
+def integrated_loudness(step_energy, step, frames):
+    """Gated BS.1770 loudness (LUFS) from K-weighted energy per gating step
+
+    step_energy[i] is the K-weighted sum of squares (full scale = 1) of
+    frames [i * step, (i + 1) * step) over all channels, which are weighted
+    equally as the standard does for mono and stereo. Sounds shorter than
+    one gating block are measured as a single block.
+    """
+    block_steps = round(LOUDNESS_BLOCK_S / LOUDNESS_STEP_S)
+    full_steps = frames // step
+    if full_steps < block_steps:
+        if not frames:
+            return float('-inf')
+        powers = np.array([step_energy.sum() / frames])
+    else:
+        window = np.convolve(step_energy[:full_steps], np.ones(block_steps), 'valid')
+        powers = window / (block_steps * step)
+
+    def loudness(power):
+        return -0.691 + 10 * np.log10(power) if power > 0 else float('-inf')
+
+    gated = powers[powers > 10 ** ((ABSOLUTE_GATE_LUFS + 0.691) / 10)]
+    if not gated.size:
+        return float('-inf')
+    relative_gate = loudness(gated.mean()) + RELATIVE_GATE_LU
+    gated = gated[gated > 10 ** ((relative_gate + 0.691) / 10)]
+    return float(loudness(gated.mean()))
+
+
+def to_db(value):
+    """Amplitude ratio to dB (silence maps to -inf)"""
+    return 20 * np.log10(value) if value > 0 else float('-inf')
+
+
+def analyze(info, samples, silence_db=-50.0, pad_ms=5.0):
+    """Peak/RMS levels and the non-silent frame range of one file
+
+    Besides the whole-file RMS, the unweighted RMS of the trimmed
+    (non-silent) section is reported as active RMS, and the K-weighted
+    integrated loudness is measured in the same pass.
+    """
+    threshold = info.full_scale * 10 ** (silence_db / 20)
+    peak = 0.0
+    sum_squares = 0.0
+    first = None
+    last = None
+
+    weighting = KWeighting(info.sample_rate, info.channels)
+    step = max(1, round(info.sample_rate * LOUDNESS_STEP_S))
+    step_energy = np.zeros(-(-info.frames // step))
+
+    for offset, block in blocks(samples):
+        magnitude = np.abs(block)
+        peak = max(peak, float(magnitude.max(initial=0.0)))
+        sum_squares += float(np.square(block, dtype=np.float64).sum())
+
+        weighted = weighting(block / info.full_scale)
+        steps = np.arange(offset, offset + len(block)) // step
+        energy = np.bincount(steps - steps[0], weights=np.square(weighted).sum(axis=1))
+        step_energy[steps[0]:steps[0] + len(energy)] += energy
+
+        active = np.flatnonzero(magnitude.max(axis=1) > threshold)
+        if active.size:
+            if first is None:
+                first = offset + int(active[0])
+            last = offset + int(active[-1])
+
+    total = info.frames * info.channels
+    pad = int(info.sample_rate * pad_ms / 1000)
+    if first is None:
+        start, stop = 0, 0
+    else:
+        start = max(0, first - pad)
+        stop = min(info.frames, last + 1 + pad)
+
+    active_squares = 0.0
+    for _, block in blocks(samples, start, stop):
+        active_squares += float(np.square(block, dtype=np.float64).sum())
+    active_total = (stop - start) * info.channels
+
+    return {
+        "peak_db": to_db(peak / info.full_scale),
+        "rms_db": to_db(np.sqrt(sum_squares / total) / info.full_scale) if total else float('-inf'),
+        "active_rms_db": (
+            to_db(np.sqrt(active_squares / active_total) / info.full_scale)
+            if active_total else float('-inf')
+        ),
+        "loudness_lufs": integrated_loudness(step_energy, step, info.frames),
+        "start": start,
+        "stop": stop,
+    }
+
+
+def write_wav(path, info, samples, start, stop, gain=1.0):
+    """Stream samples[start:stop] (optionally scaled) into a new WAV file
+
+    The original fmt chunk is copied verbatim; other metadata chunks are
+    dropped. Unscaled data is written straight from the memmap.
+    """
+    frame_bytes = info.dtype.itemsize * info.channels
+    data_size = (stop - start) * frame_bytes
+    fmt_size = len(info.fmt_chunk)
+    riff_size = 4 + (8 + fmt_size + fmt_size % 2) + (8 + data_size + data_size % 2)
+
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<4sI4s', b'RIFF', riff_size, b'WAVE'))
+        f.write(struct.pack('<4sI', b'fmt ', fmt_size))
+        f.write(info.fmt_chunk + b'\0' * (fmt_size % 2))
+        f.write(struct.pack('<4sI', b'data', data_size))
+
+        if gain == 1.0:
+            for offset in range(start, stop, BLOCK_FRAMES):
+                f.write(memoryview(samples[offset:min(offset + BLOCK_FRAMES, stop)]))
+        else:
+            # Clip range in the centred domain produced by blocks()
+            if info.dtype.kind == 'f':
+                low, high = -1.0, 1.0
+            elif info.dtype == np.uint8:
+                low, high = -128, 127
+            else:
+                limits = np.iinfo(info.dtype)
+                low, high = limits.min, limits.max
+            for _, block in blocks(samples, start, stop):
+                block *= gain
+                if info.dtype.kind != 'f':
+                    np.rint(block, out=block)
+                np.clip(block, low, high, out=block)
+                if info.dtype == np.uint8:
+                    block += 128.0
+                f.write(block.astype(info.dtype).tobytes())
+
+        if data_size % 2:
+            f.write(b'\0')
+
+
+def process_file(path, target_peak_db=None, silence_db=-50.0, pad_ms=5.0, dry_run=False,
+                 target_loudness=None):
+    """Analyze one file and rewrite it if trimming or normalization applies
+
+    target_peak_db normalizes the sample peak; target_loudness (LUFS)
+    normalizes the integrated loudness instead, with the gain limited so
+    the peak stays at or below LOUDNESS_PEAK_CEILING_DB.
+    """
+    info = read_wav_info(path)
+    samples = info.memmap()
+    stats = analyze(info, samples, silence_db, pad_ms)
+
+    gain_db = 0.0
+    if target_loudness is not None and np.isfinite(stats["loudness_lufs"]):
+        gain_db = min(target_loudness - stats["loudness_lufs"],
+                      LOUDNESS_PEAK_CEILING_DB - stats["peak_db"])
+    elif target_peak_db is not None and np.isfinite(stats["peak_db"]):
+        gain_db = target_peak_db - stats["peak_db"]
+    gain = 10 ** (gain_db / 20) if abs(gain_db) >= 0.1 else 1.0
+
+    trimmed = stats["start"] > 0 or stats["stop"] < info.frames
+    stats["changed"] = (trimmed or gain != 1.0) and stats["stop"] > stats["start"]
+    stats["gain"] = gain
+    stats["info"] = info
+
+    if stats["changed"] and not dry_run:
+        temp_path = path + ".tmp"
+        write_wav(temp_path, info, samples, stats["start"], stats["stop"], gain)
+        # Release the mapping before replacing the file (required on Windows)
+        del samples
+        os.replace(temp_path, path)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", help="WAV files (default: app sounds)")
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--normalize", type=float, metavar="DBFS",
+                        help="normalize peak level to this dBFS value")
+    target.add_argument("--loudness", type=float, metavar="LUFS",
+                        help="normalize integrated loudness to this LUFS value")
+    parser.add_argument("--silence", type=float, default=-50.0, metavar="DBFS",
+                        help="level below which audio counts as silence")
+    parser.add_argument("--pad-ms", type=float, default=5.0,
+                        help="silence kept around the trimmed sound")
+    parser.add_argument("--dry-run", action="store_true", help="report only")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(SOUNDS_DIR, "*.wav")))
+
+    for path in files:
+        try:
+            stats = process_file(path, args.normalize, args.silence, args.pad_ms, args.dry_run,
+                                 args.loudness)
+        except FileNotFoundError:
+            print(f"File not found: {path}")
+            print()
+            continue
+        except ValueError as e:
+            print(f"Error processing {path}: {e}")
+            print()
+            continue
+
+        info = stats["info"]
+        rate = info.sample_rate
+        print(f"{path}")
+        print(f"  {info.channels} ch, {rate}Hz, {info.bits}-bit, {info.frames / rate * 1000:.0f}ms")
+        print(f"  Peak: {stats['peak_db']:.1f} dBFS, RMS: {stats['rms_db']:.1f} dBFS, "
+              f"Active RMS: {stats['active_rms_db']:.1f} dBFS, "
+              f"Loudness: {stats['loudness_lufs']:.1f} LUFS")
+        print(f"  Leading silence: {stats['start'] / rate * 1000:.1f}ms, "
+              f"trailing silence: {(info.frames - stats['stop']) / rate * 1000:.1f}ms")
+        if stats["changed"]:
+            action = "Would write" if args.dry_run else "Written"
+            print(f"  {action}: {(stats['stop'] - stats['start']) / rate * 1000:.0f}ms, "
+                  f"gain {to_db(stats['gain']):+.1f} dB")
+        print()
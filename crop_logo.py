@@ -1,8 +1,9 @@
-from PIL import Image
 import sys
 
-# Open the image
-img = Image.open('docs/store-assets/logo.png')
+from pixel_cache import open_rgba
+
+# Open the image (decoded pixels come from the shared cache)
+img = open_rgba('docs/store-assets/logo.png')
 
 # Get the bounding box of the non-transparent area
 bbox = img.getbbox()
@@ -4,18 +4,20 @@ Script to crop logo-header.png removing dark background
 """
 from PIL import Image
 import numpy as np
+import argparse
 
-def crop_logo_header(input_path, output_path):
-    """Crop logo by detecting non-background content"""
-    # Open image
-    img = Image.open(input_path)
+from optimize_pngs import MAX_RMSE, describe_result, optimize_png
+from pixel_cache import load_rgba
 
-    # Convert to RGBA
-    if img.mode != 'RGBA':
-        img = img.convert('RGBA')
+def crop_logo_header(input_path, output_path, max_rmse=MAX_RMSE):
+    """Crop logo by detecting non-background content
 
-    # Convert to numpy array
-    data = np.array(img)
+    The saved PNG goes through optimize_png with the given palette error
+    bound (0 keeps it lossless, None skips optimization).
+    """
+    # Read-only RGBA pixels from the shared decode cache
+    data = load_rgba(input_path)
+    img = Image.fromarray(data, 'RGBA')
 
     # Get the background color from corner (assume corners are background)
     bg_color = data[0, 0]
@@ -61,13 +63,23 @@ def crop_logo_header(input_path, output_path):
         print(f"  Original size: {img.size}")
         print(f"  Cropped size: {result.size}")
         print(f"  Saved to: {output_path}")
+        if max_rmse is not None:
+            print(f"  Optimized: {describe_result(optimize_png(output_path, max_rmse=max_rmse, rgba=cropped_data))}")
         return True
     else:
         print(f"No content found in {input_path}")
         return False
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Crop the dark background from logo-header.png")
+    parser.add_argument("--max-rmse", type=float, default=MAX_RMSE,
+                        help="largest palette quantization error (0 = lossless)")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="save a plain RGBA PNG without optimization")
+    args = parser.parse_args()
+
     crop_logo_header(
         "smart-divination/apps/tarot/assets/branding/logo-header.png",
-        "smart-divination/apps/tarot/assets/branding/logo-header.png"
+        "smart-divination/apps/tarot/assets/branding/logo-header.png",
+        max_rmse=None if args.no_optimize else args.max_rmse,
     )
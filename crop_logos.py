@@ -2,17 +2,19 @@
 """
 Script to crop transparent/white space from PNG images
 """
-from PIL import Image
-import sys
+import argparse
 
-def crop_image(input_path, output_path=None):
-    """Crop image to remove transparent/white borders"""
-    if output_path is None:
-        output_path = input_path
+import numpy as np
 
-    # Open image
-    img = Image.open(input_path)
+from optimize_pngs import MAX_RMSE, describe_result, optimize_png
+from pixel_cache import open_rgba
 
+def crop_to_content(img):
+    """Crop an already opened image to its non-transparent bounding box
+
+    Returns (rgba_image, cropped_image); cropped_image is None when the
+    image has no visible content.
+    """
     # Convert to RGBA if not already
     if img.mode != 'RGBA':
         img = img.convert('RGBA')
@@ -21,36 +23,57 @@ def crop_image(input_path, output_path=None):
     bbox = img.getbbox()
 
     if bbox:
-        # Crop to bounding box
-        cropped = img.crop(bbox)
+        return img, img.crop(bbox)
+    return img, None
+
+def crop_image(input_path, output_path=None, max_rmse=MAX_RMSE):
+    """Crop image to remove transparent/white borders
 
+    The saved PNG goes through optimize_png with the given palette error
+    bound (0 keeps it lossless, None skips optimization).
+    """
+    if output_path is None:
+        output_path = input_path
+
+    # Open image
+    img, cropped = crop_to_content(open_rgba(input_path))
+
+    if cropped is not None:
         # Save
         cropped.save(output_path, 'PNG')
         print(f"Cropped {input_path}")
         print(f"  Original size: {img.size}")
         print(f"  Cropped size: {cropped.size}")
         print(f"  Saved to: {output_path}")
+        if max_rmse is not None:
+            print(f"  Optimized: {describe_result(optimize_png(output_path, max_rmse=max_rmse, rgba=np.asarray(cropped)))}")
         return True
     else:
         print(f"No content found in {input_path}")
         return False
 
 if __name__ == "__main__":
-    # List of images to crop
+    parser = argparse.ArgumentParser(description="Crop transparent borders from the logo PNGs")
+    parser.add_argument("--max-rmse", type=float, default=MAX_RMSE,
+                        help="largest palette quantization error (0 = lossless)")
+    parser.add_argument("--no-optimize", action="store_true",
+                        help="save plain RGBA PNGs without optimization")
+    args = parser.parse_args()
+    max_rmse = None if args.no_optimize else args.max_rmse
+
+    # List of images to crop. The sized store variants (logo-header-*,
+    # logo-icon-*) are generated at exact dimensions by generate_icon_set.py
+    # and must not be cropped here.
     images = [
         "docs/store-assets/logo.png",
         "docs/store-assets/icon2.png",
-        "docs/store-assets/logo-header-1024x350.png",
-        "docs/store-assets/logo-header-512x175.png",
-        "docs/store-assets/logo-icon-1024x1024.png",
-        "docs/store-assets/logo-icon-512x512.png",
         "smart-divination/apps/tarot/assets/branding/logo-header.png",
         "smart-divination/apps/tarot/assets/branding/logo-icon.png",
     ]
 
     for img_path in images:
         try:
-            crop_image(img_path)
+            crop_image(img_path, max_rmse=max_rmse)
             print()
         except FileNotFoundError:
             print(f"File not found: {img_path}")
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Diff UI screenshots for regression checks.
+
+For each pair of captures this computes a per-pixel change mask (same
+channel-difference threshold as crop_logo_header.py), the bounding boxes of
+the changed regions and a block-wise SSIM score, all vectorized in NumPy.
+Pairs are processed in parallel and a compact palette diff PNG is written
+for every pair that changed.
+
+Usage:
+    python diff_screenshots.py                   # diff the root capture series
+    python diff_screenshots.py a.png b.png c.png # diff a sequence pairwise
+"""
+import glob
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from pixel_cache import load_rgba
+
+OUTPUT_DIR = "screenshot_diffs"
+
+# Capture series in the repo root; each is diffed in name order
+SERIES_PREFIXES = ["lunar_", "phases_", "scroll_", "calendar_", "ask_moon_banner_"]
+
+# SSIM stabilising constants for 8-bit data
+SSIM_C1 = (0.01 * 255) ** 2
+SSIM_C2 = (0.03 * 255) ** 2
+
+# Diff PNG palette: 16 grey levels for the dimmed background, then overlays
+GREY_LEVELS = 16
+CHANGED_INDEX = GREY_LEVELS
+BOX_INDEX = GREY_LEVELS + 1
+
+
+def load_rgb(path):
+    """(H, W, 3) read-only view of a screenshot's cached RGBA pixels"""
+    return load_rgba(path)[..., :3]
+
+
+def change_mask(a, b, threshold=30):
+    """Pixels whose summed RGB difference exceeds the threshold"""
+    diff = np.abs(a.astype(np.int16) - b.astype(np.int16))
+    return diff.sum(axis=2) > threshold
+
+
+def changed_regions(mask, block=16):
+    """Bounding boxes (x0, y0, x1, y1) of connected changed regions
+
+    The mask is pooled into block x block cells; touching cells are grouped
+    by vectorized label propagation and each group's pixel extent is
+    returned. Boxes are in pixel coordinates, x1/y1 exclusive.
+    """
+    height, width = mask.shape
+    rows = -(-height // block)
+    cols = -(-width // block)
+    padded = np.zeros((rows * block, cols * block), dtype=bool)
+    padded[:height, :width] = mask
+    cells = padded.reshape(rows, block, cols, block).any(axis=(1, 3))
+    if not cells.any():
+        return []
+
+    # Start with a unique label per changed cell, then repeatedly take the
+    # max over the 8-neighbourhood until the labels stop changing
+    labels = np.where(cells, np.arange(1, cells.size + 1).reshape(cells.shape), 0)
+    while True:
+        grown = np.pad(labels, 1)
+        neighbours = np.max(
+            [grown[dy:dy + rows, dx:dx + cols] for dy in range(3) for dx in range(3)],
+            axis=0,
+        )
+        updated = np.where(cells, neighbours, 0)
+        if np.array_equal(updated, labels):
+            break
+        labels = updated
+
+    # Per-label extent of the changed pixels inside each cell group
+    ys, xs = np.nonzero(mask)
+    pixel_labels = labels[ys // block, xs // block]
+    unique, inverse = np.unique(pixel_labels, return_inverse=True)
+    x0 = np.full(len(unique), width)
+    y0 = np.full(len(unique), height)
+    x1 = np.zeros(len(unique), dtype=int)
+    y1 = np.zeros(len(unique), dtype=int)
+    np.minimum.at(x0, inverse, xs)
+    np.minimum.at(y0, inverse, ys)
+    np.maximum.at(x1, inverse, xs + 1)
+    np.maximum.at(y1, inverse, ys + 1)
+    return [tuple(int(v) for v in box) for box in zip(x0, y0, x1, y1)]
+
+
+def block_ssim(a, b, block=8):
+    """Mean SSIM over non-overlapping block x block luma windows
+
+    Images smaller than one block are scored as a single whole-image window.
+    """
+    weights = np.array([0.299, 0.587, 0.114])
+    luma_a = a.astype(np.float64) @ weights
+    luma_b = b.astype(np.float64) @ weights
+
+    if luma_a.size == 0:
+        return 1.0
+    height, width = luma_a.shape
+    if height < block or width < block:
+        shape = (1, height, 1, width)
+        wa = luma_a.reshape(shape)
+        wb = luma_b.reshape(shape)
+    else:
+        rows = height // block
+        cols = width // block
+        shape = (rows, block, cols, block)
+        wa = luma_a[:rows * block, :cols * block].reshape(shape)
+        wb = luma_b[:rows * block, :cols * block].reshape(shape)
+
+    mean_a = wa.mean(axis=(1, 3))
+    mean_b = wb.mean(axis=(1, 3))
+    var_a = wa.var(axis=(1, 3))
+    var_b = wb.var(axis=(1, 3))
+    cov = (wa * wb).mean(axis=(1, 3)) - mean_a * mean_b
+
+    ssim = ((2 * mean_a * mean_b + SSIM_C1) * (2 * cov + SSIM_C2)) / (
+        (mean_a ** 2 + mean_b ** 2 + SSIM_C1) * (var_a + var_b + SSIM_C2)
+    )
+    return float(ssim.mean())
+
+
+def render_diff(base, mask, boxes):
+    """Palette image: dimmed grey base, changed pixels red, regions outlined"""
+    grey = base.astype(np.uint16).sum(axis=2) // 3
+    indices = (grey * GREY_LEVELS // 256).astype(np.uint8)
+    indices[mask] = CHANGED_INDEX
+    for x0, y0, x1, y1 in boxes:
+        indices[y0, x0:x1] = BOX_INDEX
+        indices[y1 - 1, x0:x1] = BOX_INDEX
+        indices[y0:y1, x0] = BOX_INDEX
+        indices[y0:y1, x1 - 1] = BOX_INDEX
+
+    # Grey ramp kept dark so the overlays stand out
+    palette = []
+    for level in range(GREY_LEVELS):
+        value = level * 96 // (GREY_LEVELS - 1)
+        palette += [value, value, value]
+    palette += [255, 0, 0]  # changed pixels
+    palette += [255, 255, 0]  # region boxes
+
+    img = Image.fromarray(indices, 'P')
+    img.putpalette(palette)
+    return img
+
+
+def diff_pair(before_path, after_path, output_dir=OUTPUT_DIR, threshold=30):
+    """Diff two screenshots; writes a diff PNG when anything changed"""
+    a = load_rgb(before_path)
+    b = load_rgb(after_path)
+
+    result = {
+        "before": before_path,
+        "after": after_path,
+        "size_mismatch": a.shape != b.shape,
+    }
+    if result["size_mismatch"]:
+        # Compare the overlapping area only
+        height = min(a.shape[0], b.shape[0])
+        width = min(a.shape[1], b.shape[1])
+        a = a[:height, :width]
+        b = b[:height, :width]
+
+    mask = change_mask(a, b, threshold)
+    boxes = changed_regions(mask)
+    result["changed_ratio"] = float(mask.mean())
+    result["regions"] = boxes
+    result["ssim"] = block_ssim(a, b)
+    result["diff_path"] = None
+
+    if boxes:
+        name = (
+            os.path.splitext(os.path.basename(before_path))[0]
+            + "__"
+            + os.path.splitext(os.path.basename(after_path))[0]
+            + ".png"
+        )
+        result["diff_path"] = os.path.join(output_dir, name)
+        os.makedirs(output_dir, exist_ok=True)
+        # Already an 18-colour palette; fast deflate is enough
+        render_diff(b, mask, boxes).save(result["diff_path"], 'PNG', compress_level=1)
+    return result
+
+
+def diff_pairs(pairs, output_dir=OUTPUT_DIR, threshold=30, max_workers=None):
+    """Run diff_pair over many (before, after) pairs in parallel"""
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(diff_pair, before, after, output_dir, threshold)
+            for before, after in pairs
+        ]
+        return [future.result() for future in futures]
+
+
+def sequence_pairs(paths):
+    """Consecutive pairs of a capture sequence"""
+    return list(zip(paths, paths[1:]))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 2:
+        sys.exit("Usage: python diff_screenshots.py [before.png after.png ...]")
+    if len(sys.argv) > 2:
+        pairs = sequence_pairs(sys.argv[1:])
+    else:
+        pairs = []
+        for prefix in SERIES_PREFIXES:
+            pairs += sequence_pairs(sorted(glob.glob(f"{prefix}*.png")))
+
+    for result in diff_pairs(pairs):
+        print(f"{result['before']} -> {result['after']}")
+        if result["size_mismatch"]:
+            print("  Size mismatch: compared overlapping area only")
+        print(f"  Changed pixels: {result['changed_ratio'] * 100:.2f}%")
+        print(f"  SSIM: {result['ssim']:.4f}")
+        print(f"  Changed regions: {len(result['regions'])}")
+        if result["diff_path"]:
+            print(f"  Saved to: {result['diff_path']}")
+        print()
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Generate every app icon and store logo size from the master images.
+
+Each master is decoded and cropped once (same bbox logic as crop_logos.py),
+then downsampled progressively: the image is halved with a box filter until
+it is just above the next target size, and that level is reused for every
+smaller size. Masters are processed in parallel.
+"""
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
+
+from crop_logos import crop_to_content
+from pixel_cache import open_rgba
+
+TAROT_APP = "smart-divination/apps/tarot"
+ANDROID_RES = f"{TAROT_APP}/android/app/src/main/res"
+IOS_APPICONSET = f"{TAROT_APP}/ios/Runner/Assets.xcassets/AppIcon.appiconset"
+
+# Android density buckets as multiples of mdpi
+ANDROID_DENSITIES = {
+    "mdpi": 1.0,
+    "hdpi": 1.5,
+    "xhdpi": 2.0,
+    "xxhdpi": 3.0,
+    "xxxhdpi": 4.0,
+}
+
+# Legacy launcher icon size and adaptive icon layer size, in dp
+LAUNCHER_ICON_DP = 48
+ADAPTIVE_ICON_DP = 108
+
+# Only the inner 72dp of an adaptive icon layer is guaranteed to be visible
+ADAPTIVE_SAFE_ZONE = 72 / 108
+
+# An output image. The cropped master is resized to content_scale * box
+# (fitted to keep its aspect ratio when the job uses fit=True) and centred
+# on a transparent canvas of exactly box. mode optionally converts the
+# result (e.g. "RGB" for opaque launcher icons).
+Target = namedtuple("Target", "path box content_scale mode", defaults=(1.0, None))
+
+
+def android_icon_targets(res_dir=ANDROID_RES):
+    """Legacy mipmap icons plus adaptive icon foregrounds for every density
+
+    mipmap-anydpi-v26/ic_launcher.xml draws @drawable/ic_launcher_foreground
+    over @color/ic_launcher_background, so the foreground keeps its padding
+    transparent and the artwork inside the safe zone.
+    """
+    targets = []
+    for density, scale in ANDROID_DENSITIES.items():
+        size = round(LAUNCHER_ICON_DP * scale)
+        targets.append(Target(
+            os.path.join(res_dir, f"mipmap-{density}", "ic_launcher.png"),
+            (size, size),
+            mode="RGB",
+        ))
+    for density, scale in ANDROID_DENSITIES.items():
+        size = round(ADAPTIVE_ICON_DP * scale)
+        targets.append(Target(
+            os.path.join(res_dir, f"drawable-{density}", "ic_launcher_foreground.png"),
+            (size, size),
+            content_scale=ADAPTIVE_SAFE_ZONE,
+        ))
+    return targets
+
+
+def ios_icon_targets(appiconset_dir=IOS_APPICONSET):
+    """Icon targets listed in the AppIcon Contents.json (deduplicated by filename)"""
+    with open(os.path.join(appiconset_dir, "Contents.json"), encoding="utf-8") as f:
+        contents = json.load(f)
+
+    targets = {}
+    for image in contents["images"]:
+        filename = image.get("filename")
+        if not filename:
+            continue
+        points = float(image["size"].split("x")[0])
+        scale = int(image["scale"].rstrip("x"))
+        pixels = int(round(points * scale))
+        targets[filename] = Target(
+            os.path.join(appiconset_dir, filename), (pixels, pixels), mode="RGB"
+        )
+    return list(targets.values())
+
+
+def fit_size(size, box):
+    """Largest size with the aspect ratio of `size` that fits inside `box`"""
+    width, height = size
+    scale = min(box[0] / width, box[1] / height)
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def resize_pyramid(img, sizes):
+    """Resize img to every (width, height) in sizes, reusing halved levels
+
+    Sizes are served largest first. Before each final Lanczos resize the
+    current level is halved with Image.reduce() while it stays at least as
+    large as every remaining size in both dimensions, so each halving is
+    computed once, shared by all smaller sizes, and nothing is upscaled.
+    """
+    # Premultiply alpha so the box filter does not bleed colour from
+    # fully transparent pixels into the edges
+    premultiplied = img.mode == "RGBA"
+    level = img.convert("RGBa") if premultiplied else img
+
+    ordered = sorted(set(sizes), key=lambda s: s[0] * s[1], reverse=True)
+    results = {}
+    for index, size in enumerate(ordered):
+        need_width = max(s[0] for s in ordered[index:])
+        need_height = max(s[1] for s in ordered[index:])
+        while level.width >= 2 * need_width and level.height >= 2 * need_height:
+            level = level.reduce(2)
+        resized = level.resize(size, Image.LANCZOS)
+        results[size] = resized.convert("RGBA") if premultiplied else resized
+    return results
+
+
+def content_size(size, target, fit):
+    """Size of the resized master inside a target's canvas"""
+    inner = (
+        max(1, round(target.box[0] * target.content_scale)),
+        max(1, round(target.box[1] * target.content_scale)),
+    )
+    return fit_size(size, inner) if fit else inner
+
+
+def generate_from_master(master_path, targets, fit=False):
+    """Decode and crop one master, then write all of its targets
+
+    targets is a list of Target. With fit=True the cropped content is scaled
+    to fit inside each box keeping its aspect ratio; otherwise it is resized
+    to the exact content size. Every output has exactly the box size.
+    """
+    _, cropped = crop_to_content(open_rgba(master_path))
+    if cropped is None:
+        print(f"No content found in {master_path}")
+        return []
+
+    sizes = [content_size(cropped.size, target, fit) for target in targets]
+    resized = resize_pyramid(cropped, sizes)
+
+    written = []
+    for target, size in zip(targets, sizes):
+        out = resized[size]
+        if size != target.box:
+            canvas = Image.new("RGBA", target.box, (0, 0, 0, 0))
+            offset = ((target.box[0] - size[0]) // 2, (target.box[1] - size[1]) // 2)
+            canvas.paste(out.convert("RGBA"), offset)
+            out = canvas
+        if target.mode and out.mode != target.mode:
+            out = out.convert(target.mode)
+        os.makedirs(os.path.dirname(target.path) or ".", exist_ok=True)
+        out.save(target.path, "PNG")
+        written.append((target.path, target.box))
+    return written
+
+
+def generate_icon_set(jobs, max_workers=None):
+    """Run generate_from_master for every job in parallel
+
+    jobs is a list of dicts with the generate_from_master keyword arguments.
+    """
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(generate_from_master, **job) for job in jobs]
+        for job, future in zip(jobs, futures):
+            try:
+                written = future.result()
+            except FileNotFoundError:
+                print(f"File not found: {job['master_path']}")
+                print()
+                continue
+            print(f"Generated from {job['master_path']}")
+            for path, size in written:
+                print(f"  {size[0]}x{size[1]}: {path}")
+            print()
+
+
+if __name__ == "__main__":
+    jobs = [
+        {
+            # App icon (same master as flutter_launcher_icons in pubspec.yaml)
+            "master_path": f"{TAROT_APP}/assets/app_icon/icon2.png",
+            "targets": android_icon_targets() + ios_icon_targets() + [
+                Target("docs/store-assets/logo-icon-1024x1024.png", (1024, 1024)),
+                Target("docs/store-assets/logo-icon-512x512.png", (512, 512)),
+            ],
+        },
+        {
+            # Store headers keep the aspect ratio of the cropped logo and are
+            # centred on a transparent canvas of the stated size
+            "master_path": "docs/store-assets/logo.png",
+            "targets": [
+                Target("docs/store-assets/logo-header-1024x350.png", (1024, 350)),
+                Target("docs/store-assets/logo-header-512x175.png", (512, 175)),
+            ],
+            "fit": True,
+        },
+    ]
+
+    generate_icon_set(jobs)
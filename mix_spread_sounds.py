@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Pre-mix the card deal and reveal sounds for each spread into single clips.
+
+Dealing or revealing a spread used to fire one card_deal.wav/card_flip.wav
+playback per card, each with its own player and latency. This renders the
+whole sequence offline: every event of a timing pattern is overlap-added in
+one vectorized step per source sound, then a soft limiter keeps the sum
+below full scale. The app can then play one clip per spread and action.
+
+Event times follow the app's own animation timing and are relative to the
+first card, so each clip starts with the first sound.
+"""
+import os
+import wave
+
+import numpy as np
+
+from analyze_sounds import read_wav_info
+
+SOUNDS_DIR = "smart-divination/apps/tarot/assets/sounds"
+
+# Source clips written by generate_card_deal_sound.py / generate_card_flip_sound.py
+SOURCES = {
+    "deal": os.path.join(SOUNDS_DIR, "card_deal.wav"),
+    "flip": os.path.join(SOUNDS_DIR, "card_flip.wav"),
+}
+
+# Cards per spread (matching assets/spread-buttons)
+SPREAD_CARD_COUNTS = {
+    "three-card": 3,
+    "simple-cross": 5,
+    "celtic-cross": 10,
+}
+
+# Delay between revealed cards (flipDelay in _revealCardsSequentially, main.dart)
+REVEAL_DELAY = 0.5
+
+# Soft limiter: linear up to the threshold, tanh knee up to the ceiling
+LIMIT_THRESHOLD = 0.7
+LIMIT_CEILING = 0.95
+
+
+def deal_delay(card_count):
+    """Seconds between dealt cards; mirrors _dealCardsSequentially in main.dart"""
+    if card_count <= 5:
+        return 1.0
+    if card_count <= 7:
+        return 0.6
+    if card_count <= 10:
+        return 0.4
+    return 0.3
+
+
+def spread_patterns(card_counts=SPREAD_CARD_COUNTS):
+    """Deal and reveal timing patterns per spread
+
+    Maps output names to lists of (sound, start time in seconds, gain).
+    """
+    patterns = {}
+    for spread, count in card_counts.items():
+        name = spread.replace('-', '_')
+        delay = deal_delay(count)
+        patterns[f"deal_{name}"] = [("deal", delay * i, 1.0) for i in range(count)]
+        patterns[f"reveal_{name}"] = [("flip", REVEAL_DELAY * i, 1.0) for i in range(count)]
+    return patterns
+
+
+def load_clip(path):
+    """Mono float32 samples (-1..1) and sample rate of a 16-bit PCM WAV"""
+    info = read_wav_info(path)
+    if info.dtype != np.dtype('<i2'):
+        raise ValueError(f"Expected 16-bit PCM: {path}")
+    samples = info.memmap().astype(np.float32) / info.full_scale
+    return samples.mean(axis=1), info.sample_rate
+
+
+def soft_limit(signal, threshold=LIMIT_THRESHOLD, ceiling=LIMIT_CEILING):
+    """Compress peaks above threshold smoothly towards ceiling"""
+    magnitude = np.abs(signal)
+    knee = ceiling - threshold
+    limited = threshold + knee * np.tanh((magnitude - threshold) / knee)
+    return np.where(magnitude > threshold, np.sign(signal) * limited, signal)
+
+
+def mix_events(clips, sample_rate, events):
+    """Overlap-add every event into one buffer
+
+    clips maps sound names to float32 arrays; events is a list of
+    (sound, start_seconds, gain). All events of the same sound are summed
+    with a single np.bincount over a (events x clip_length) index grid.
+    """
+    if not events:
+        raise ValueError("Cannot mix a pattern without events")
+    end = max(start + len(clips[sound]) / sample_rate for sound, start, _ in events)
+    length = int(np.ceil(end * sample_rate)) + 1
+    mix = np.zeros(length, dtype=np.float64)
+
+    for sound, clip in clips.items():
+        selected = [(start, gain) for name, start, gain in events if name == sound]
+        if not selected:
+            continue
+        starts = np.rint(np.array([start for start, _ in selected]) * sample_rate).astype(np.intp)
+        gains = np.array([gain for _, gain in selected])
+
+        positions = starts[:, None] + np.arange(len(clip))
+        weights = gains[:, None] * clip[None, :]
+        mix += np.bincount(positions.ravel(), weights=weights.ravel(), minlength=length)
+
+    return soft_limit(mix)
+
+
+def write_clip(output_file, signal, sample_rate):
+    """Write a mono float signal as 16-bit PCM"""
+    sound_int = np.int16(np.clip(signal, -1.0, 1.0) * 32767)
+
+    with wave.open(output_file, 'w') as wav_file:
+        wav_file.setnchannels(1)  # Mono
+        wav_file.setsampwidth(2)  # 16-bit
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(sound_int.tobytes())
+
+
+def mix_spread_sounds(output_dir=SOUNDS_DIR, patterns=None, sources=SOURCES):
+    """Render one pre-mixed clip per timing pattern
+
+    Only the source sounds that the patterns use are loaded.
+    """
+    if patterns is None:
+        patterns = spread_patterns()
+
+    used = {sound for events in patterns.values() for sound, _, _ in events}
+    clips = {}
+    sample_rate = None
+    for name in sorted(used):
+        path = sources[name]
+        clips[name], rate = load_clip(path)
+        if sample_rate is not None and rate != sample_rate:
+            raise ValueError(f"Sample rate mismatch: {path} is {rate}Hz, expected {sample_rate}Hz")
+        sample_rate = rate
+
+    os.makedirs(output_dir, exist_ok=True)
+    for name, events in patterns.items():
+        if not events:
+            print(f"Skipping {name}: no events")
+            continue
+        output_file = os.path.join(output_dir, f"{name}.wav")
+        mix = mix_events(clips, sample_rate, events)
+        write_clip(output_file, mix, sample_rate)
+
+        print(f"Generated {name} sound: {output_file}")
+        print(f"  Cards: {len(events)}, Duration: {len(mix) / sample_rate * 1000:.0f}ms")
+        print(f"  Peak: {np.abs(mix).max() * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    mix_spread_sounds()
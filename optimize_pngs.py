@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Shrink PNG assets with palette quantization and a compression search.
+
+Images are quantized to an alpha-aware palette (vectorized median cut in
+premultiplied RGBA space) when the error stays within a configurable RMSE
+bound. The palette and truecolor encodings are then filtered with every PNG
+filter (plus per-row adaptive selection), compressed at several zlib levels
+and strategies in parallel, and the smallest result is kept. Files are only
+rewritten when the result is smaller than the original.
+
+Usage:
+    python optimize_pngs.py [--max-rmse N] [--dry-run] [files...]
+"""
+import argparse
+import os
+import shutil
+import struct
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pixel_cache import load_rgba
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+COLOR_TYPE_RGB = 2
+COLOR_TYPE_PALETTE = 3
+COLOR_TYPE_RGBA = 6
+
+# PNG filter types, plus -1 for per-row adaptive selection
+FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH = range(5)
+FILTER_ADAPTIVE = -1
+FILTERS = [FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH, FILTER_ADAPTIVE]
+
+COMPRESS_LEVELS = [6, 9]
+COMPRESS_STRATEGIES = [zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED]
+
+# Default quantization error bound (RMSE over premultiplied RGBA, 0-255)
+MAX_RMSE = 2.0
+
+DEFAULT_IMAGES = [
+    "smart-divination/apps/tarot/assets/branding/logo.png",
+    "smart-divination/apps/tarot/assets/branding/logo-header.png",
+    "smart-divination/apps/tarot/assets/branding/logo-icon.png",
+    "docs/store-assets/logo-header-1024x350.png",
+    "docs/store-assets/logo-header-512x175.png",
+    "docs/store-assets/logo-icon-1024x1024.png",
+    "docs/store-assets/logo-icon-512x512.png",
+]
+
+
+def premultiply(rgba):
+    """uint8 RGBA -> float32 premultiplied RGBA in the 0-255 range"""
+    out = rgba.astype(np.float32)
+    out[..., :3] *= out[..., 3:4] / 255.0
+    return out
+
+
+def unpremultiply(premultiplied):
+    """float32 premultiplied RGBA -> uint8 RGBA"""
+    alpha = premultiplied[..., 3:4]
+    rgb = np.where(alpha > 0, premultiplied[..., :3] * 255.0 / np.maximum(alpha, 1e-6), 0)
+    out = np.concatenate([rgb, alpha], axis=-1)
+    return np.clip(np.rint(out), 0, 255).astype(np.uint8)
+
+
+def _box_stats(colors, weights):
+    """Weighted SSE of a box and the channel with the largest variance"""
+    total = weights.sum()
+    mean = (colors * weights[:, None]).sum(axis=0) / total
+    variance = ((colors - mean) ** 2 * weights[:, None]).sum(axis=0)
+    return float(variance.sum()), int(variance.argmax())
+
+
+def median_cut(colors, weights, max_colors=256):
+    """Partition weighted colors into at most max_colors boxes
+
+    The box with the largest weighted squared error is split at the
+    weighted median of its highest-variance channel. Returns the weighted
+    mean colour of every box.
+    """
+    boxes = [np.arange(len(colors))]
+    stats = [_box_stats(colors, weights)]
+
+    while len(boxes) < max_colors:
+        best = max(range(len(boxes)), key=lambda i: stats[i][0])
+        sse, channel = stats[best]
+        if sse <= 0:
+            break
+
+        indices = boxes[best]
+        order = np.argsort(colors[indices, channel], kind='stable')
+        cumulative = np.cumsum(weights[indices][order])
+        cut = int(np.searchsorted(cumulative, cumulative[-1] / 2)) + 1
+        cut = min(max(cut, 1), len(indices) - 1)
+
+        left = indices[order[:cut]]
+        right = indices[order[cut:]]
+        boxes[best] = left
+        stats[best] = _box_stats(colors[left], weights[left])
+        boxes.append(right)
+        stats.append(_box_stats(colors[right], weights[right]))
+
+    return np.array([
+        (colors[box] * weights[box, None]).sum(axis=0) / weights[box].sum()
+        for box in boxes
+    ], dtype=np.float32)
+
+
+def nearest(colors, palette, chunk=1 << 16):
+    """Index of the closest palette entry for every color"""
+    palette_norms = (palette ** 2).sum(axis=1)
+    result = np.empty(len(colors), dtype=np.intp)
+    for start in range(0, len(colors), chunk):
+        block = colors[start:start + chunk]
+        distances = palette_norms[None, :] - 2 * block @ palette.T
+        result[start:start + chunk] = distances.argmin(axis=1)
+    return result
+
+
+def quantize(rgba, max_colors=256):
+    """Quantize an (H, W, 4) uint8 image to a palette
+
+    Returns (indices, palette_rgba, rmse). The palette is sorted by alpha so
+    that the PNG tRNS chunk can stop at the last translucent entry.
+    """
+    height, width = rgba.shape[:2]
+    pixels = rgba.reshape(-1, 4).copy()
+    # Colour is irrelevant under full transparency
+    pixels[pixels[:, 3] == 0] = 0
+
+    packed = pixels.view(np.uint32).ravel()
+    unique, inverse, counts = np.unique(packed, return_inverse=True, return_counts=True)
+    unique_rgba = unique.view(np.uint8).reshape(-1, 4)
+    colors = premultiply(unique_rgba)
+    weights = counts.astype(np.float64)
+
+    if len(unique_rgba) <= max_colors:
+        palette = unique_rgba
+        mapping = np.arange(len(unique_rgba))
+    else:
+        palette = unpremultiply(median_cut(colors, weights, max_colors))
+        mapping = nearest(colors, premultiply(palette))
+
+    # Error of the final (rounded) palette, weighted by pixel counts
+    error = premultiply(palette)[mapping] - colors
+    rmse = float(np.sqrt((error ** 2 * weights[:, None]).sum() / (weights.sum() * 4)))
+
+    order = np.argsort(palette[:, 3], kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    indices = rank[mapping][inverse.ravel()].astype(np.uint8).reshape(height, width)
+    return indices, palette[order], rmse
+
+
+def filter_rows(raw, bpp, filter_type):
+    """Apply a PNG filter to (H, row_bytes) uint8 scanlines
+
+    Returns (H, row_bytes + 1) bytes with the filter type byte prepended.
+    FILTER_ADAPTIVE picks, per row, the filter with the smallest sum of
+    absolute signed residuals.
+    """
+    x = raw.astype(np.int16)
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+    up = np.zeros_like(x)
+    up[1:] = x[:-1]
+    up_left = np.zeros_like(x)
+    up_left[1:, bpp:] = x[:-1, :-bpp]
+
+    def residual(kind):
+        if kind == FILTER_NONE:
+            return x
+        if kind == FILTER_SUB:
+            return x - left
+        if kind == FILTER_UP:
+            return x - up
+        if kind == FILTER_AVERAGE:
+            return x - (left + up) // 2
+        # Paeth predictor
+        p = left + up - up_left
+        pa = np.abs(p - left)
+        pb = np.abs(p - up)
+        pc = np.abs(p - up_left)
+        predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+        return x - predictor
+
+    if filter_type == FILTER_ADAPTIVE:
+        candidates = np.stack([residual(kind) & 0xFF for kind in range(5)])
+        signed = candidates.astype(np.uint8).view(np.int8).astype(np.int32)
+        choice = np.abs(signed).sum(axis=2).argmin(axis=0)
+        filtered = candidates[choice, np.arange(len(x))]
+    else:
+        choice = np.full(len(x), filter_type)
+        filtered = residual(filter_type) & 0xFF
+
+    out = np.empty((raw.shape[0], raw.shape[1] + 1), dtype=np.uint8)
+    out[:, 0] = choice
+    out[:, 1:] = filtered
+    return out
+
+
+def _chunk(chunk_type, data):
+    return (
+        struct.pack('>I', len(data))
+        + chunk_type
+        + data
+        + struct.pack('>I', zlib.crc32(chunk_type + data) & 0xFFFFFFFF)
+    )
+
+
+def _compress(data, level, strategy):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def encode_png(raw, width, height, color_type, idat, palette=None):
+    """Assemble a PNG file from pre-compressed image data"""
+    chunks = [_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, color_type, 0, 0, 0))]
+    if palette is not None:
+        chunks.append(_chunk(b'PLTE', palette[:, :3].tobytes()))
+        translucent = np.flatnonzero(palette[:, 3] < 255)
+        if translucent.size:
+            chunks.append(_chunk(b'tRNS', palette[:translucent[-1] + 1, 3].tobytes()))
+    chunks.append(_chunk(b'IDAT', idat))
+    chunks.append(_chunk(b'IEND', b''))
+    return PNG_SIGNATURE + b''.join(chunks)
+
+
+def smallest_encoding(candidates, executor):
+    """Try every filter/level/strategy for each candidate; return the smallest PNG
+
+    candidates is a list of (raw_rows, bpp, color_type, palette).
+    """
+    filter_jobs = [
+        (candidate, executor.submit(filter_rows, candidate[0], candidate[1], filter_type))
+        for candidate in candidates
+        for filter_type in FILTERS
+    ]
+    compress_jobs = []
+    for candidate, job in filter_jobs:
+        data = job.result().tobytes()
+        for level in COMPRESS_LEVELS:
+            for strategy in COMPRESS_STRATEGIES:
+                compress_jobs.append((candidate, executor.submit(_compress, data, level, strategy)))
+
+    # Smallest image data per candidate; the PLTE/tRNS overhead is the same
+    # for all of a candidate's encodings
+    best_idat = {}
+    for candidate, job in compress_jobs:
+        idat = job.result()
+        key = id(candidate)
+        if key not in best_idat or len(idat) < len(best_idat[key][1]):
+            best_idat[key] = (candidate, idat)
+
+    # Compare whole files so palette chunks count against the palette candidate
+    encodings = []
+    for (raw, bpp, color_type, palette), idat in best_idat.values():
+        height, row_bytes = raw.shape
+        encodings.append(encode_png(raw, row_bytes // bpp, height, color_type, idat, palette))
+    return min(encodings, key=len)
+
+
+def optimize_png(input_path, output_path=None, max_rmse=MAX_RMSE, dry_run=False, executor=None,
+                 rgba=None):
+    """Write the smallest acceptable encoding of a PNG
+
+    rgba may carry the image's pixels when the caller already has them
+    (e.g. a file it just saved), which skips decoding and the pixel cache.
+
+    Returns (original_size, new_size, used_palette, rmse). The new encoding
+    is only written when it is smaller; otherwise a separate output_path
+    gets a copy of the original.
+    """
+    if output_path is None:
+        output_path = input_path
+
+    if rgba is None:
+        rgba = load_rgba(input_path)
+    height, width = rgba.shape[:2]
+
+    candidates = []
+    if (rgba[..., 3] == 255).all():
+        candidates.append((rgba[..., :3].reshape(height, -1), 3, COLOR_TYPE_RGB, None))
+    else:
+        candidates.append((rgba.reshape(height, -1), 4, COLOR_TYPE_RGBA, None))
+
+    indices, palette, rmse = quantize(rgba)
+    used_palette = rmse <= max_rmse
+    if used_palette:
+        candidates.append((indices, 1, COLOR_TYPE_PALETTE, palette))
+
+    own_executor = executor is None
+    if own_executor:
+        executor = ThreadPoolExecutor()
+    try:
+        data = smallest_encoding(candidates, executor)
+    finally:
+        if own_executor:
+            executor.shutdown()
+
+    original_size = os.path.getsize(input_path)
+    used_palette = used_palette and data[25] == COLOR_TYPE_PALETTE
+    smaller = len(data) < original_size
+    used_palette = used_palette and smaller
+    if not dry_run:
+        if smaller:
+            with open(output_path, 'wb') as f:
+                f.write(data)
+        elif os.path.abspath(output_path) != os.path.abspath(input_path):
+            shutil.copyfile(input_path, output_path)
+    return original_size, min(len(data), original_size), used_palette, rmse
+
+
+def describe_result(result):
+    """One-line summary of an optimize_png() result"""
+    before, after, used_palette, rmse = result
+    palette = f"palette (RMSE {rmse:.2f})" if used_palette else "truecolor"
+    return f"{before / 1024:.1f} KB -> {after / 1024:.1f} KB, {palette}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("files", nargs="*", help="PNG files (default: branding logos)")
+    parser.add_argument("--max-rmse", type=float, default=MAX_RMSE,
+                        help="largest quantization RMSE accepted for a palette")
+    parser.add_argument("--dry-run", action="store_true", help="report only")
+    args = parser.parse_args()
+
+    total_before = 0
+    total_after = 0
+    with ThreadPoolExecutor() as executor:
+        for path in args.files or DEFAULT_IMAGES:
+            try:
+                result = optimize_png(
+                    path, max_rmse=args.max_rmse, dry_run=args.dry_run, executor=executor
+                )
+            except FileNotFoundError:
+                print(f"File not found: {path}")
+                print()
+                continue
+
+            total_before += result[0]
+            total_after += result[1]
+            print(f"{path}")
+            print(f"  {describe_result(result)}")
+            print()
+
+    print(f"Total: {total_before / 1024:.1f} KB -> {total_after / 1024:.1f} KB")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Shared cache of decoded RGBA pixels for the image tools.
+
+The first time an image is requested it is decoded once, converted to RGBA
+and stored as a .npy file named after a hash of the file contents. Later
+requests (from any tool, in any process) memory-map that file read-only, so
+they get the pixels without decoding or copying. Editing an image changes
+its hash, so stale entries are never returned; the least recently used
+entries are evicted once the cache grows past MAX_CACHE_BYTES.
+
+Usage:
+    python pixel_cache.py           # show cache size
+    python pixel_cache.py --clear   # delete all cached entries
+"""
+import hashlib
+import os
+import sys
+import tempfile
+
+import numpy as np
+from PIL import Image
+
+# Next to the tools, independent of the working directory
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".pixel_cache")
+
+# Size cap for the cache; least recently used entries are evicted first
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Bump when the decoded representation changes
+CACHE_VERSION = b"rgba-1"
+
+HASH_CHUNK = 1 << 20
+
+
+def file_hash(path):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.blake2b(CACHE_VERSION, digest_size=20)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _entries(cache_dir):
+    """(path, size, mtime) of every cached entry"""
+    if not os.path.isdir(cache_dir):
+        return []
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".npy"):
+            entry = os.path.join(cache_dir, name)
+            try:
+                stat = os.stat(entry)
+            except FileNotFoundError:
+                continue
+            entries.append((entry, stat.st_size, stat.st_mtime))
+    return entries
+
+
+def prune_cache(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES, keep=None):
+    """Evict least recently used entries until the cache fits in max_bytes
+
+    Entries still mapped by another process cannot be deleted on Windows;
+    they are skipped and picked up by a later prune.
+    """
+    entries = sorted(_entries(cache_dir), key=lambda entry: entry[2])
+    total = sum(size for _, size, _ in entries)
+    for entry, size, _ in entries:
+        if total <= max_bytes:
+            break
+        if entry == keep:
+            continue
+        try:
+            os.remove(entry)
+        except OSError:
+            continue
+        total -= size
+    return total
+
+
+def load_rgba(path, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """Read-only (H, W, 4) uint8 memmap of an image's decoded RGBA pixels"""
+    cache_path = os.path.join(cache_dir, file_hash(path) + ".npy")
+
+    if os.path.exists(cache_path):
+        # Mark as recently used for LRU eviction
+        try:
+            os.utime(cache_path)
+        except OSError:
+            pass
+    else:
+        img = Image.open(path)
+        if img.mode != 'RGBA':
+            img = img.convert('RGBA')
+
+        # Write to a unique temporary file first so that concurrent writers
+        # (processes or threads) never share it and readers never map a
+        # partially written entry
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            np.save(f, np.asarray(img))
+
+        if os.path.exists(cache_path):
+            # Another writer stored the same content meanwhile
+            os.remove(temp_path)
+        else:
+            try:
+                os.replace(temp_path, cache_path)
+            except (PermissionError, FileNotFoundError):
+                # The entry appeared meanwhile and is mapped elsewhere
+                # (Windows), or the temporary file is gone; either way the
+                # stored entry is used if there is one
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                if not os.path.exists(cache_path):
+                    raise
+        prune_cache(cache_dir, max_bytes, keep=cache_path)
+
+    return np.load(cache_path, mmap_mode='r')
+
+
+def open_rgba(path, cache_dir=CACHE_DIR):
+    """RGBA PIL image backed by the cached pixels
+
+    Image.fromarray shares the read-only buffer where possible; operations
+    such as crop() or resize() return new images as usual.
+    """
+    return Image.fromarray(load_rgba(path, cache_dir), 'RGBA')
+
+
+def clear_cache(cache_dir=CACHE_DIR):
+    """Delete every cached entry; returns the number of bytes freed"""
+    freed = 0
+    if not os.path.isdir(cache_dir):
+        return freed
+    for name in os.listdir(cache_dir):
+        entry = os.path.join(cache_dir, name)
+        try:
+            size = os.path.getsize(entry)
+            os.remove(entry)
+        except OSError:
+            # Still mapped by a running tool (Windows)
+            continue
+        freed += size
+    return freed
+
+
+if __name__ == "__main__":
+    if "--clear" in sys.argv[1:]:
+        freed = clear_cache()
+        print(f"Cleared {CACHE_DIR}: {freed / 1024 / 1024:.1f} MB freed")
+    else:
+        entries = _entries(CACHE_DIR)
+        size = sum(size for _, size, _ in entries)
+        print(f"{CACHE_DIR}: {len(entries)} entries, {size / 1024 / 1024:.1f} MB "
+              f"(limit {MAX_CACHE_BYTES / 1024 / 1024:.0f} MB)")
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Report unused and missing assets for every Flutter app in smart-divination/apps.
+
+All asset paths of an app, plus the `assets/` and `AssetSource(` markers,
+are compiled into a single Aho-Corasick automaton. Each lib/**/*.dart file
+(with comments stripped) and the pubspec.yaml is then run through it once:
+asset path hits mark references, and marker hits read the literal that
+follows so that dangling references (paths that do not exist) and
+interpolated paths ('assets/cards/$name.jpg') are resolved in the same scan.
+"""
+import bisect
+import os
+import re
+import sys
+from collections import deque
+
+APPS_DIR = "smart-divination/apps"
+
+# Characters that delimit a path inside Dart/YAML source
+QUOTES = "'\""
+
+# Automaton markers that start an asset literal
+LITERAL_MARKER = "assets/"
+SOURCE_MARKER = "AssetSource("
+
+# Body of a path literal, read locally from a marker hit
+LITERAL_BODY = re.compile(r"""[^'"\s#]*""")
+SOURCE_ARGUMENT = re.compile(r"""\s*(['"])([^'"\s]*)['"]""")
+INTERPOLATION = re.compile(r"\$\{[^}]*\}|\$\w+")
+
+# Dart string literals (kept) and comments (dropped)
+DART_STRINGS_AND_COMMENTS = re.compile(
+    r"""('(?:\\.|[^'\\\n])*'|"(?:\\.|[^"\\\n])*")|//[^\n]*|/\*.*?\*/""",
+    re.DOTALL,
+)
+
+
+class AhoCorasick:
+    """Multi-pattern matcher: one automaton, one linear scan per text"""
+
+    def __init__(self, patterns):
+        # Node 0 is the root; each node is a dict of char -> node
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for pattern in patterns:
+            node = 0
+            for char in pattern:
+                if char not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[node][char] = len(self.goto) - 1
+                node = self.goto[node][char]
+            self.output[node].append(pattern)
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.fail[child] == child:
+                    self.fail[child] = 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def finditer(self, text):
+        """Yield (end_index, pattern) for every occurrence in text"""
+        node = 0
+        for index, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for pattern in self.output[node]:
+                yield index + 1, pattern
+
+
+def list_assets(app_dir):
+    """Map 'assets/...' paths to file sizes for one app"""
+    assets = {}
+    assets_dir = os.path.join(app_dir, "assets")
+    for root, _, files in os.walk(assets_dir):
+        for name in files:
+            if name == ".gitkeep":
+                continue
+            full_path = os.path.join(root, name)
+            key = os.path.relpath(full_path, app_dir).replace(os.sep, "/")
+            assets[key] = os.path.getsize(full_path)
+    return assets
+
+
+def build_matcher(assets):
+    """Compile every asset path (and its AssetSource form) into one automaton
+
+    Returns the matcher and a pattern -> asset path lookup. AssetSource paths
+    are relative to assets/, so the prefix-less form is added too. The
+    literal markers map to None.
+    """
+    lookup = {}
+    for path in assets:
+        lookup[path] = path
+        lookup[path[len("assets/"):]] = path
+    lookup[LITERAL_MARKER] = None
+    lookup[SOURCE_MARKER] = None
+    return AhoCorasick(lookup), lookup
+
+
+def strip_dart_comments(text):
+    """Drop // and /* */ comments, leaving string literals untouched"""
+    return DART_STRINGS_AND_COMMENTS.sub(lambda m: m.group(1) or "", text)
+
+
+def dart_sources(app_dir):
+    """All Dart files under lib/"""
+    for root, _, files in os.walk(os.path.join(app_dir, "lib")):
+        for name in sorted(files):
+            if name.endswith(".dart"):
+                yield os.path.join(root, name)
+
+
+def split_pubspec(text):
+    """Split pubspec.yaml into (bundle entries, remaining text)
+
+    Entries of the flutter `assets:` list only declare what is bundled; the
+    rest of the file (e.g. flutter_launcher_icons) is scanned as references.
+    """
+    entries = []
+    other_lines = []
+    in_assets = False
+    assets_indent = 0
+    for line in text.splitlines():
+        stripped = line.strip()
+        indent = len(line) - len(line.lstrip())
+        if stripped == "assets:":
+            in_assets = True
+            assets_indent = indent
+            continue
+        if in_assets:
+            if stripped.startswith("- ") and indent >= assets_indent:
+                entries.append(stripped[2:].strip().strip(QUOTES))
+                continue
+            if stripped and not stripped.startswith("#"):
+                in_assets = False
+        if stripped.startswith("#"):
+            continue
+        other_lines.append(line)
+    return entries, "\n".join(other_lines)
+
+
+def is_bundled(path, entries):
+    """Flutter bundles listed files and the direct children of listed dirs"""
+    for entry in entries:
+        if entry.endswith("/"):
+            if path.startswith(entry) and "/" not in path[len(entry):]:
+                return True
+        elif path == entry:
+            return True
+    return False
+
+
+def scan_text(text, matcher, lookup):
+    """One automaton pass over text: referenced assets and asset literals
+
+    A path hit only counts when it is delimited by quotes or whitespace, so
+    'banner.png' does not match inside 'home_banner.png'. Marker hits read
+    the literal that follows them in place.
+    """
+    referenced = set()
+    literals = set()
+    for end, pattern in matcher.finditer(text):
+        start = end - len(pattern)
+        before = text[start - 1] if start > 0 else "\n"
+
+        if pattern == SOURCE_MARKER:
+            match = SOURCE_ARGUMENT.match(text, end)
+            if match:
+                literal = match.group(2)
+                if not literal.startswith(LITERAL_MARKER):
+                    literal = LITERAL_MARKER + literal
+                literals.add(literal)
+            continue
+
+        if pattern == LITERAL_MARKER:
+            if before in QUOTES or before.isspace():
+                literals.add(pattern + LITERAL_BODY.match(text, end).group(0))
+            continue
+
+        after = text[end] if end < len(text) else "\n"
+        if (before in QUOTES or before.isspace()) and (after in QUOTES or after.isspace()):
+            referenced.add(lookup[pattern])
+    return referenced, literals
+
+
+def match_interpolated(literal, sorted_assets):
+    """Assets matching an interpolated path such as 'assets/cards/$name.jpg'
+
+    Only assets sharing the literal's fixed prefix are tested.
+    """
+    parts = INTERPOLATION.split(literal)
+    shape = re.compile(".+".join(re.escape(part) for part in parts) + "$")
+    prefix = parts[0]
+    first = bisect.bisect_left(sorted_assets, prefix)
+    last = bisect.bisect_left(sorted_assets, prefix + "\uffff")
+    return [path for path in sorted_assets[first:last] if shape.match(path)]
+
+
+def scan_app(app_dir):
+    """Scan one app; returns a dict with unused, unbundled and dangling paths"""
+    assets = list_assets(app_dir)
+    matcher, lookup = build_matcher(assets)
+    referenced = set()
+    literals = set()
+
+    for path in dart_sources(app_dir):
+        with open(path, encoding="utf-8") as f:
+            hits, found = scan_text(strip_dart_comments(f.read()), matcher, lookup)
+        referenced |= hits
+        literals |= found
+
+    entries = []
+    pubspec_path = os.path.join(app_dir, "pubspec.yaml")
+    if os.path.exists(pubspec_path):
+        with open(pubspec_path, encoding="utf-8") as f:
+            entries, rest = split_pubspec(f.read())
+        hits, found = scan_text(rest, matcher, lookup)
+        referenced |= hits
+        literals |= found
+
+    sorted_assets = sorted(assets)
+    dangling = []
+    for literal in sorted(literals):
+        if INTERPOLATION.search(literal):
+            # Interpolated path: every asset matching its shape may be used
+            matches = match_interpolated(literal, sorted_assets)
+            referenced.update(matches)
+            if not matches:
+                dangling.append(literal)
+        elif literal not in assets:
+            dangling.append(literal)
+
+    for entry in entries:
+        if not os.path.exists(os.path.join(app_dir, entry)):
+            dangling.append(f"{entry} (pubspec)")
+
+    unused = sorted(path for path in assets if path not in referenced)
+    return {
+        "assets": assets,
+        "unused_bundled": [path for path in unused if is_bundled(path, entries)],
+        "unused_unbundled": [path for path in unused if not is_bundled(path, entries)],
+        "dangling": dangling,
+    }
+
+
+def print_report(app_dir, report):
+    """Print the scan result for one app"""
+    assets = report["assets"]
+    print(f"{app_dir}: {len(assets)} asset files")
+
+    bundled_bytes = sum(assets[path] for path in report["unused_bundled"])
+    print(f"  Unreferenced and bundled ({bundled_bytes / 1024:.1f} KB to drop):")
+    for path in report["unused_bundled"]:
+        print(f"    {path} ({assets[path] / 1024:.1f} KB)")
+
+    print("  Unreferenced and not bundled:")
+    for path in report["unused_unbundled"]:
+        print(f"    {path}")
+
+    print("  Dangling references:")
+    for path in report["dangling"]:
+        print(f"    {path}")
+    print()
+
+
+if __name__ == "__main__":
+    apps_dir = sys.argv[1] if len(sys.argv) > 1 else APPS_DIR
+
+    for name in sorted(os.listdir(apps_dir)):
+        app_dir = os.path.join(apps_dir, name)
+        if os.path.isdir(os.path.join(app_dir, "assets")):
+            print_report(app_dir, scan_app(app_dir))